@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import Optional
+
+try:
+    from llmlingua import PromptCompressor
+except ImportError:  # Optional dependency
+    PromptCompressor = None
+
+_COMPRESSOR_MODEL = "microsoft/llmlingua-2-xlm-roberta-large-meetingbank"
+
+# Short texts are sent as-is; compression overhead outweighs the token savings
+MIN_COMPRESS_CHARS = 800
+
+# Separators that must survive so dates, amounts and labels stay intact
+_FORCE_TOKENS = ['\n', '.', ':', '$', '/', '-', ',']
+
+_compressor = None
+_compressor_lock = threading.Lock()
+
+
+def compression_available() -> bool:
+    """Check whether LLMLingua prompt compression can be used"""
+    return PromptCompressor is not None and os.getenv("DOCUAGENT_PROMPT_COMPRESSION", "1") != "0"
+
+
+def get_compressor() -> Optional["PromptCompressor"]:
+    """Lazily load the shared LLMLingua-2 compressor"""
+    global _compressor
+    
+    if not compression_available():
+        return None
+    
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = PromptCompressor(model_name=_COMPRESSOR_MODEL, use_llmlingua2=True)
+        return _compressor
+
+
+def compress_text(text: str, rate: float) -> str:
+    """Compress document text before sending it to the LLM, falling back to the original text"""
+    if len(text) < MIN_COMPRESS_CHARS:
+        return text
+    
+    try:
+        compressor = get_compressor()
+        if compressor is None:
+            return text
+        
+        result = compressor.compress_prompt(
+            text,
+            rate=rate,
+            force_tokens=_FORCE_TOKENS,
+            force_reserve_digit=True
+        )
+        return result["compressed_prompt"]
+    
+    except Exception as e:
+        print(f"Prompt compression failed: {e}")
+        return text
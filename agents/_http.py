@@ -0,0 +1,26 @@
+import threading
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # Enables HTTP/2 in httpx
+    _HTTP2_AVAILABLE = True
+except ImportError:  # Optional dependency
+    _HTTP2_AVAILABLE = False
+
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+_TIMEOUT = 60.0
+
+_shared_client: Optional[httpx.Client] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide HTTP client shared by all ChatOpenAI instances"""
+    global _shared_client
+    
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = httpx.Client(http2=_HTTP2_AVAILABLE, limits=_LIMITS, timeout=_TIMEOUT)
+        return _shared_client
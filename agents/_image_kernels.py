@@ -0,0 +1,120 @@
+import os
+import numpy as np
+from typing import Optional
+
+try:
+    from numba import config as numba_config, njit, prange
+    
+    # Kernels are called from OCR worker threads, which needs a thread-safe layer; TBB can
+    # hang at interpreter exit when first started off the main thread, so prefer OpenMP
+    if not os.getenv("NUMBA_THREADING_LAYER"):
+        numba_config.THREADING_LAYER_PRIORITY = ["omp", "tbb", "workqueue"]
+except ImportError:  # Optional dependency
+    njit = None
+
+# Above this size the per-row working set no longer fits in cache; OpenCV wins
+MAX_FUSED_PIXELS = 16_000_000
+
+
+if njit is not None:
+    
+    @njit(cache=True, inline="always")
+    def _median9(p0, p1, p2, p3, p4, p5, p6, p7, p8):
+        """Median of nine values with a pruned 19 compare-swap sorting network"""
+        p1, p2 = min(p1, p2), max(p1, p2)
+        p4, p5 = min(p4, p5), max(p4, p5)
+        p7, p8 = min(p7, p8), max(p7, p8)
+        p0, p1 = min(p0, p1), max(p0, p1)
+        p3, p4 = min(p3, p4), max(p3, p4)
+        p6, p7 = min(p6, p7), max(p6, p7)
+        p1, p2 = min(p1, p2), max(p1, p2)
+        p4, p5 = min(p4, p5), max(p4, p5)
+        p7, p8 = min(p7, p8), max(p7, p8)
+        p3 = max(p0, p3)
+        p5 = min(p5, p8)
+        p4, p7 = min(p4, p7), max(p4, p7)
+        p6 = max(p3, p6)
+        p4 = max(p1, p4)
+        p2 = min(p2, p5)
+        p4 = min(p4, p7)
+        p4, p2 = min(p4, p2), max(p4, p2)
+        p4 = max(p6, p4)
+        return min(p4, p2)
+    
+    @njit(cache=True)
+    def _histogram(gray):
+        """256-bin intensity histogram in one pass; works on strided views without copying"""
+        hist = np.zeros(256, dtype=np.int64)
+        h, w = gray.shape
+        for y in range(h):
+            for x in range(w):
+                hist[gray[y, x]] += 1
+        return hist
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fused_median_threshold(gray, thresh):
+        """3x3 median blur and binarization in one pass over the image"""
+        h, w = gray.shape
+        out = np.empty_like(gray)
+        
+        for y in prange(h):
+            # Replicated borders, matching cv2.medianBlur
+            ya = max(y - 1, 0)
+            yb = min(y + 1, h - 1)
+            for x in range(w):
+                xa = max(x - 1, 0)
+                xb = min(x + 1, w - 1)
+                m = _median9(
+                    gray[ya, xa], gray[ya, x], gray[ya, xb],
+                    gray[y, xa], gray[y, x], gray[y, xb],
+                    gray[yb, xa], gray[yb, x], gray[yb, xb]
+                )
+                out[y, x] = 255 if m > thresh else 0
+        return out
+    
+    # Compile (or load from the on-disk cache) at import so the first OCR page does not pay for it
+    try:
+        _histogram(np.zeros((64, 64), dtype=np.uint8))
+        _histogram(np.zeros((64, 64), dtype=np.uint8)[::4, ::4])  # Strided layout compiles separately
+        _fused_median_threshold(np.zeros((64, 64), dtype=np.uint8), 0)
+    except Exception as e:
+        print(f"Numba image kernels disabled: {e}")
+        njit = None
+
+
+def histogram(gray: np.ndarray) -> np.ndarray:
+    """256-bin histogram of a uint8 grayscale image"""
+    if njit is not None:
+        return _histogram(gray)
+    return np.bincount(gray.ravel(), minlength=256)
+
+
+def histogram_std(hist: np.ndarray) -> float:
+    """Standard deviation of the intensities summarized by a histogram"""
+    levels = np.arange(256, dtype=np.float64)
+    total = hist.sum()
+    mean = (hist * levels).sum() / total
+    return float(np.sqrt((hist * (levels - mean) ** 2).sum() / total))
+
+
+def otsu_threshold(hist: np.ndarray) -> int:
+    """Otsu's threshold from a histogram; pixels above it are foreground, as in cv2.threshold"""
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist).astype(np.float64)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_bg[-1] - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    between[~np.isfinite(between)] = -1.0
+    return int(np.argmax(between))
+
+
+def fused_median_threshold(gray: np.ndarray, thresh: int) -> Optional[np.ndarray]:
+    """3x3 median + binary threshold in one pass, or None when the fused kernel does not apply"""
+    if njit is None or gray.ndim != 2 or gray.dtype != np.uint8 or gray.size > MAX_FUSED_PIXELS:
+        return None
+    
+    return _fused_median_threshold(np.ascontiguousarray(gray), thresh)
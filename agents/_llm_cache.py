@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+# Bump whenever a prompt changes so stale responses are not served
+PROMPT_VERSION = "v2"
+
+# Cached responses expire after 7 days
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+CACHE_DIR = os.getenv(
+    "DOCUAGENT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "docuagent")
+)
+
+
+def make_cache_key(*parts: str) -> bytes:
+    """Build a SHA-256 cache key from prompt components"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")  # Separator so ("ab", "c") != ("a", "bc")
+    return digest.digest()
+
+
+class LLMCache:
+    """SQLite-backed key/value store for LLM responses keyed by prompt content hash"""
+    
+    def __init__(self, path: Optional[str] = None, ttl: int = DEFAULT_TTL_SECONDS):
+        self.path = path or os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "hash BLOB PRIMARY KEY, response TEXT NOT NULL, "
+                    "created_at INTEGER NOT NULL, expires_at INTEGER NOT NULL)"
+                )
+        except (OSError, sqlite3.Error) as e:
+            print(f"LLM cache disabled: {e}")
+            self._conn = None
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired"""
+        if self._conn is None:
+            return None
+        
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response, expires_at FROM responses WHERE hash = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"LLM cache read failed: {e}")
+            return None
+        
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+    
+    def set(self, key: bytes, response: str) -> None:
+        """Store a response under key"""
+        if self._conn is None:
+            return
+        
+        now = int(time.time())
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (hash, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, now + self.ttl)
+                )
+        except sqlite3.Error as e:
+            print(f"LLM cache write failed: {e}")
+
+
+_shared_cache: Optional[LLMCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide LLM cache, or None when disabled via DOCUAGENT_LLM_CACHE=0"""
+    global _shared_cache
+    
+    if os.getenv("DOCUAGENT_LLM_CACHE", "1") == "0":
+        return None
+    
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
@@ -1,19 +1,51 @@
 import os
-import json
-from typing import Dict, List, Any, Optional
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain.tools import Tool
+import re
+import asyncio
+from typing import Dict, List, Any, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from .ocr_processor import OCRProcessor
+from ._llm_cache import PROMPT_VERSION, get_llm_cache, make_cache_key
+from ._compression import compress_text
+from ._http import get_http_client
 from utils.validation import DocumentValidator
 
+# Static classification instructions, kept ahead of the document text so the prefix is cacheable
+_CLASSIFICATION_SYSTEM = """You are a document classification expert. Analyze the provided text and classify it into one of these categories:
+            - invoice: Business invoices, bills for services/products
+            - medical_bill: Hospital bills, medical invoices, insurance claims
+            - prescription: Medical prescriptions, pharmacy documents
+            
+            Look for key indicators:
+            - Invoice: Item descriptions, quantities, prices, tax amounts, vendor information
+            - Medical_bill: Patient information, medical procedures, insurance details, provider names
+            - Prescription: Medication names, dosages, doctor names, pharmacy information
+            
+            Respond with only the classification: invoice, medical_bill, or prescription"""
+
+_CLASSIFICATION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _CLASSIFICATION_SYSTEM),
+    ("user", "Classify this document text:\n\n{text}")
+])
+
+# Cheap keyword hints used to predict the document type before the LLM answers
+_DOC_TYPE_HINT_RE = re.compile(r'\b(invoice|bill\s*to|prescription|rx|patient|diagnosis)\b', re.I)
+_DOC_TYPE_HINTS = {
+    'invoice': 'invoice',
+    'bill to': 'invoice',
+    'prescription': 'prescription',
+    'rx': 'prescription',
+    'patient': 'medical_bill',
+    'diagnosis': 'medical_bill'
+}
+
 class DocumentProcessor:
     """Main document processing agent that orchestrates the entire pipeline"""
     
     def __init__(self):
         self.ocr_processor = OCRProcessor()
         self.validator = DocumentValidator()
+        self.cache = get_llm_cache()
         
         # Initialize LangChain LLM
         api_key = os.getenv("OPENAI_API_KEY")
@@ -23,30 +55,26 @@ class DocumentProcessor:
         self.llm = ChatOpenAI(
             temperature=0,
             model="gpt-4o",  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-            openai_api_key=api_key
+            openai_api_key=api_key,
+            http_client=get_http_client()  # Keep connections warm across agents
         )
     
     def detect_document_type(self, text_content: str) -> str:
         """Detect the type of document using LLM"""
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a document classification expert. Analyze the provided text and classify it into one of these categories:
-            - invoice: Business invoices, bills for services/products
-            - medical_bill: Hospital bills, medical invoices, insurance claims
-            - prescription: Medical prescriptions, pharmacy documents
-            
-            Look for key indicators:
-            - Invoice: Item descriptions, quantities, prices, tax amounts, vendor information
-            - Medical_bill: Patient information, medical procedures, insurance details, provider names
-            - Prescription: Medication names, dosages, doctor names, pharmacy information
-            
-            Respond with only the classification: invoice, medical_bill, or prescription"""),
-            ("user", "Classify this document text:\n\n{text}")
-        ])
+        text = text_content[:2000]  # Limit text length
+        cache_key = make_cache_key("classify", PROMPT_VERSION, self.llm.model_name, text)
+        
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return cached
         
         try:
-            chain = prompt | self.llm
-            response = chain.invoke({"text": text_content[:2000]})  # Limit text length
+            text = compress_text(text, rate=0.3)
+            
+            chain = _CLASSIFICATION_PROMPT | self.llm
+            response = chain.invoke({"text": text})
             
             # Handle different response types
             content = response.content if hasattr(response, 'content') else str(response)
@@ -55,6 +83,8 @@ class DocumentProcessor:
             else:
                 doc_type = str(content).strip().lower()
             if doc_type in ['invoice', 'medical_bill', 'prescription']:
+                if self.cache:
+                    self.cache.set(cache_key, doc_type)
                 return doc_type
             else:
                 return 'invoice'  # Default fallback
@@ -63,45 +93,58 @@ class DocumentProcessor:
             print(f"Error detecting document type: {e}")
             return 'invoice'  # Default fallback
     
-    def create_document_tools(self, text_content: str) -> List[Tool]:
-        """Create tools for the agent to use"""
+    async def detect_document_type_async(self, text_content: str) -> str:
+        """Run detect_document_type on a worker thread so it can be awaited alongside extraction"""
+        return await asyncio.to_thread(self.detect_document_type, text_content)
+    
+    def _heuristic_classify(self, text_content: str) -> str:
+        """Predict the document type from keyword hits in the first 500 characters"""
+        votes = {'invoice': 0, 'medical_bill': 0, 'prescription': 0}
+        for match in _DOC_TYPE_HINT_RE.finditer(text_content[:500]):
+            hint = ' '.join(match.group(1).lower().split())
+            votes[_DOC_TYPE_HINTS.get(hint, 'invoice')] += 1
         
-        def ocr_tool(query: str) -> str:
-            """Extract text using OCR capabilities"""
-            return f"OCR processing completed. Text content available for analysis."
+        return max(votes, key=votes.get)
+    
+    async def _classify_and_extract(
+        self,
+        text_content: str,
+        custom_fields: List[str],
+        extraction_agent
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Classify with the LLM while speculatively extracting against the heuristic type"""
+        predicted_type = self._heuristic_classify(text_content)
         
-        def validation_tool(data: str) -> str:
-            """Validate extracted data against business rules"""
-            try:
-                data_dict = json.loads(data) if isinstance(data, str) else data
-                validation_result = self.validator.validate_extraction(data_dict)
-                return f"Validation completed: {json.dumps(validation_result)}"
-            except Exception as e:
-                return f"Validation error: {str(e)}"
+        doc_type, extraction_result = await asyncio.gather(
+            self.detect_document_type_async(text_content),
+            extraction_agent.extract_async(text_content, predicted_type, custom_fields)
+        )
         
-        def text_analysis_tool(query: str) -> str:
-            """Analyze document text for specific patterns"""
-            return f"Text analysis available for: {len(text_content)} characters"
+        # Rare path: the prediction was wrong, so extract again with the right schema
+        if doc_type != predicted_type:
+            extraction_result = await extraction_agent.extract_async(text_content, doc_type, custom_fields)
         
-        tools = [
-            Tool(
-                name="ocr_processor",
-                description="Process images and scanned documents with OCR",
-                func=ocr_tool
-            ),
-            Tool(
-                name="validator",
-                description="Validate extracted data against business rules and patterns",
-                func=validation_tool
-            ),
-            Tool(
-                name="text_analyzer",
-                description="Analyze document text for patterns and structure",
-                func=text_analysis_tool
-            )
-        ]
+        return doc_type, extraction_result
+    
+    def classify_and_extract(
+        self,
+        text_content: str,
+        custom_fields: List[str],
+        extraction_agent
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Detect the document type and extract its fields, overlapping the two LLM calls when possible"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._classify_and_extract(text_content, custom_fields, extraction_agent))
         
-        return tools
+        # Already inside an event loop (e.g. an async server); fall back to sequential calls
+        doc_type = self.detect_document_type(text_content)
+        return doc_type, extraction_agent.extract_structured_data(
+            text_content=text_content,
+            doc_type=doc_type,
+            custom_fields=custom_fields
+        )
     
     def process_document(
         self,
@@ -120,7 +163,11 @@ class DocumentProcessor:
         try:
             # Step 1: Extract text content
             if filename.lower().endswith('.pdf'):
-                text_content = self.ocr_processor.extract_text_from_pdf(file_content)
+                # Only the first max_text_chars reach the LLM, so stop reading pages there
+                text_content = self.ocr_processor.extract_text_from_pdf(
+                    file_content,
+                    max_chars=extraction_agent.max_text_chars
+                )
             else:
                 # Image file
                 if enable_ocr:
@@ -131,14 +178,11 @@ class DocumentProcessor:
             if not text_content or len(text_content.strip()) < 10:
                 raise ValueError("Could not extract sufficient text from document. Please ensure the document is clear and readable.")
             
-            # Step 2: Detect document type
-            doc_type = self.detect_document_type(text_content)
-            
-            # Step 3: Extract structured data
-            extraction_result = extraction_agent.extract_structured_data(
-                text_content=text_content,
-                doc_type=doc_type,
-                custom_fields=custom_fields
+            # Steps 2-3: Detect document type and extract structured data
+            doc_type, extraction_result = self.classify_and_extract(
+                text_content,
+                custom_fields,
+                extraction_agent
             )
             
             # Step 4: Calculate confidence scores
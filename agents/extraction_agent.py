@@ -1,80 +1,76 @@
 import os
-import json
+import asyncio
+import functools
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+from langchain_core.messages import SystemMessage
 from models.schemas import InvoiceSchema, MedicalBillSchema, PrescriptionSchema
+from ._llm_cache import PROMPT_VERSION, get_llm_cache, make_cache_key
+from ._compression import compress_text, compression_available
+from ._http import get_http_client
+from . import _json
 from pydantic import ValidationError
 
-class ExtractionAgent:
-    """LLM-powered extraction agent with structured output"""
-    
-    def __init__(self, model: str = "gpt-4o"):
-        # Try multiple API keys in order
-        api_keys = [
-            os.getenv("OPENAI_API_KEY"),
-            os.getenv("OPENAI_API_KEY_2"),
-            os.getenv("OPENAI_API_KEY_BACKUP")
-        ]
-        
-        # Use the first available key
-        api_key = next((key for key in api_keys if key), None)
-        
-        if not api_key:
-            raise ValueError("At least one OPENAI_API_KEY environment variable is required")
-        
-        self.llm = ChatOpenAI(
-            model=model,  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
-            temperature=0
-        )
-        # API key is automatically picked up from environment variables
-        self.current_api_key = api_key
-        
-        # Schema mapping
-        self.schemas = {
-            'invoice': InvoiceSchema,
-            'medical_bill': MedicalBillSchema,
-            'prescription': PrescriptionSchema
-        }
-    
-    def get_extraction_prompt(self, doc_type: str, custom_fields: Optional[List[str]] = None) -> ChatPromptTemplate:
-        """Generate extraction prompt based on document type"""
-        
-        base_fields = {
-            'invoice': [
-                'invoice_number', 'invoice_date', 'due_date', 'vendor_name', 
-                'vendor_address', 'customer_name', 'customer_address',
-                'subtotal', 'tax_amount', 'total_amount', 'line_items'
-            ],
-            'medical_bill': [
-                'patient_name', 'patient_id', 'provider_name', 'provider_address',
-                'service_date', 'diagnosis', 'procedures', 'insurance_company',
-                'total_charges', 'insurance_paid', 'patient_responsibility'
-            ],
-            'prescription': [
-                'patient_name', 'doctor_name', 'pharmacy_name', 'prescription_date',
-                'medications', 'dosage_instructions', 'refills', 'pharmacy_phone'
-            ]
-        }
-        
-        fields_to_extract = base_fields.get(doc_type, base_fields['invoice'])
-        if custom_fields:
-            fields_to_extract.extend(custom_fields)
-        
-        fields_list = '\n'.join([f'- {field}' for field in fields_to_extract])
-        
-        system_prompt = f"""You are an expert document data extraction specialist. Extract structured information from {doc_type} documents.
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency
+    ahocorasick = None
+
+# Date formats accepted by normalize_date, tried in order
+_DATE_PATTERNS = [
+    re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})'),  # YYYY-MM-DD
+    re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'),  # MM/DD/YYYY
+    re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'),  # MM-DD-YYYY
+    re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})'), # MM.DD.YYYY
+]
+_CURRENCY_RE = re.compile(r'[$€£¥,\s]')
+_NONDIGIT_RE = re.compile(r'\D')
+
+# Field-name keywords mapped to the validation category they trigger
+_FIELD_CATEGORY_KEYWORDS = {
+    'date': 'date',
+    'amount': 'amount',
+    'total': 'amount',
+    'subtotal': 'amount',
+    'tax': 'amount',
+    'paid': 'amount',
+    'charges': 'amount',
+    'phone': 'phone'
+}
+
+if ahocorasick is not None:
+    _FIELD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword, _category in _FIELD_CATEGORY_KEYWORDS.items():
+        _FIELD_AUTOMATON.add_word(_keyword, (_category, _keyword))
+    _FIELD_AUTOMATON.make_automaton()
+else:
+    _FIELD_AUTOMATON = None
+    # Lookahead so overlapping keywords are all reported, as with the automaton
+    _FIELD_CATEGORY_RE = re.compile('(?=(' + '|'.join(_FIELD_CATEGORY_KEYWORDS) + '))')
+
+def _field_categories(field_name: str) -> set:
+    """Validation categories whose keywords occur in a lowercased field name"""
+    if _FIELD_AUTOMATON is not None:
+        return {category for _, (category, _) in _FIELD_AUTOMATON.iter(field_name)}
+    return {_FIELD_CATEGORY_KEYWORDS[m.group(1)] for m in _FIELD_CATEGORY_RE.finditer(field_name)}
+
+# Source location used when the LLM omits one; copied per field since callers may mutate it
+_DEFAULT_SOURCE = {'page': 1, 'bbox': [0, 0, 100, 20]}
+
+# Static extraction instructions. Kept byte-identical across calls and sent as the
+# first message so provider-side prompt caching can reuse the prefix.
+_STATIC_SYSTEM = """You are an expert document data extraction specialist. Extract structured information from business and medical documents.
 
 EXTRACTION REQUIREMENTS:
-1. Extract the following fields with high precision:
-{fields_list}
+1. Extract every field listed under FIELDS TO EXTRACT with high precision.
 
 2. For each field, provide:
    - name: field name
    - value: extracted value (null if not found)
    - confidence: confidence score (0.0-1.0) based on text clarity and context
-   - source: {{"page": page_number, "bbox": [x1,y1,x2,y2]}} (estimate coordinates if needed)
+   - source: {"page": page_number, "bbox": [x1,y1,x2,y2]} (estimate coordinates if needed)
 
 3. CONFIDENCE SCORING GUIDELINES:
    - 0.9-1.0: Clear, unambiguous text with strong context
@@ -91,29 +87,100 @@ EXTRACTION REQUIREMENTS:
 
 5. OUTPUT FORMAT:
 Return a JSON object with this exact structure:
-{{"fields": [
-  {{"name": "field_name", "value": "extracted_value", "confidence": 0.85, "source": {{"page": 1, "bbox": [100, 200, 300, 220]}}}}
-]}}
+{"fields": [
+  {"name": "field_name", "value": "extracted_value", "confidence": 0.85, "source": {"page": 1, "bbox": [100, 200, 300, 220]}}
+]}
 
 Be extremely careful with numerical values, dates, and proper names. If unsure, lower the confidence score rather than guessing.
 
-"""
-
-        user_prompt = """Extract structured data from this {doc_type} document:
-
-DOCUMENT TEXT:
-{text}
-
 Remember to:
 - Be precise with numerical values and dates
 - Provide realistic confidence scores
 - Include source information for each field
 - Return valid JSON only"""
+
+# Fields requested from the LLM for each document type
+_BASE_FIELDS = {
+    'invoice': (
+        'invoice_number', 'invoice_date', 'due_date', 'vendor_name', 
+        'vendor_address', 'customer_name', 'customer_address',
+        'subtotal', 'tax_amount', 'total_amount', 'line_items'
+    ),
+    'medical_bill': (
+        'patient_name', 'patient_id', 'provider_name', 'provider_address',
+        'service_date', 'diagnosis', 'procedures', 'insurance_company',
+        'total_charges', 'insurance_paid', 'patient_responsibility'
+    ),
+    'prescription': (
+        'patient_name', 'doctor_name', 'pharmacy_name', 'prescription_date',
+        'medications', 'dosage_instructions', 'refills', 'pharmacy_phone'
+    )
+}
+
+def _custom_fields_key(custom_fields: Optional[List[str]]) -> Tuple[str, ...]:
+    """Canonical hashable form of the custom field list"""
+    return tuple(sorted(custom_fields or ()))
+
+@functools.lru_cache(maxsize=32)
+def _build_extraction_prompt(doc_type: str, custom_fields_key: Tuple[str, ...]) -> ChatPromptTemplate:
+    """Build (once per doc type and custom field set) the extraction prompt template"""
+    fields_to_extract = _BASE_FIELDS.get(doc_type, _BASE_FIELDS['invoice']) + custom_fields_key
+    fields_list = '\n'.join([f'- {field}' for field in fields_to_extract])
+    
+    # Per-document-type part goes after the static prefix so the prefix stays cacheable
+    fields_prompt = f"""DOCUMENT TYPE: {doc_type}
+
+FIELDS TO EXTRACT:
+{fields_list}"""
+    
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=_STATIC_SYSTEM),
+        SystemMessage(content=fields_prompt),
+        ("user", "Extract structured data from this {doc_type} document:\n\nDOCUMENT TEXT:\n{text}")
+    ])
+
+class ExtractionAgent:
+    """LLM-powered extraction agent with structured output"""
+    
+    def __init__(self, model: str = "gpt-4o"):
+        # Try multiple API keys in order
+        api_keys = [
+            os.getenv("OPENAI_API_KEY"),
+            os.getenv("OPENAI_API_KEY_2"),
+            os.getenv("OPENAI_API_KEY_BACKUP")
+        ]
         
-        return ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("user", user_prompt)
-        ])
+        # Use the first available key
+        api_key = next((key for key in api_keys if key), None)
+        
+        if not api_key:
+            raise ValueError("At least one OPENAI_API_KEY environment variable is required")
+        
+        self.llm = ChatOpenAI(
+            model=model,  # the newest OpenAI model is "gpt-4o" which was released May 13, 2024. do not change this unless explicitly requested by the user
+            temperature=0,
+            http_client=get_http_client()  # Keep connections warm across agents
+        )
+        # JSON mode guarantees a syntactically valid JSON object in the response
+        self.json_llm = self.llm.bind(response_format={"type": "json_object"})
+        # API key is automatically picked up from environment variables
+        self.current_api_key = api_key
+        self.cache = get_llm_cache()
+        
+        # With prompt compression enabled we can afford to send more of the document
+        self.compress_prompts = compression_available()
+        self.max_text_chars = 8000 if self.compress_prompts else 4000
+        
+        # Schema mapping
+        self.schemas = {
+            'invoice': InvoiceSchema,
+            'medical_bill': MedicalBillSchema,
+            'prescription': PrescriptionSchema
+        }
+    
+    def get_extraction_prompt(self, doc_type: str, custom_fields: Optional[List[str]] = None) -> ChatPromptTemplate:
+        """Generate extraction prompt based on document type"""
+        return _build_extraction_prompt(doc_type, _custom_fields_key(custom_fields))
     
     def extract_structured_data(
         self, 
@@ -121,44 +188,74 @@ Remember to:
         doc_type: str, 
         custom_fields: Optional[List[str]] = None
     ) -> Dict[str, Any]:
-        """Extract structured data using LLM with retry mechanism"""
+        """Extract structured data using LLM in JSON mode, retrying once on API errors"""
         
-        max_retries = 3
+        max_attempts = 2
+        attempts = 0
         last_error = None
         
-        for attempt in range(max_retries):
+        text = text_content[:self.max_text_chars]  # Limit text length to avoid token limits
+        cache_key = make_cache_key(
+            "extract", PROMPT_VERSION, self.llm.model_name, doc_type,
+            "\x1f".join(_custom_fields_key(custom_fields)), text
+        )
+        
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached:
+                return {
+                    'fields': _json.loads(cached),
+                    'extraction_metadata': {
+                        'model': self.llm.model_name,
+                        'attempt': 0,
+                        'cached': True,
+                        'doc_type': doc_type,
+                        'custom_fields': custom_fields or []
+                    }
+                }
+        
+        if self.compress_prompts:
+            text = compress_text(text, rate=0.5)
+        
+        for attempt in range(max_attempts):
+            attempts = attempt + 1
             try:
                 # Get prompt template
                 prompt = self.get_extraction_prompt(doc_type, custom_fields)
                 
                 # Create chain
-                chain = prompt | self.llm
+                chain = prompt | self.json_llm
                 
                 # Invoke with response format for JSON
                 response = chain.invoke({
                     "doc_type": doc_type,
-                    "text": text_content[:4000]  # Limit text length to avoid token limits
+                    "text": text
                 })
                 
                 # Parse JSON response
                 content = response.content if hasattr(response, 'content') else str(response)
-                content = str(content).strip()
-                
-                # Clean up potential markdown formatting
-                if content.startswith('```json'):
-                    content = content[7:]
-                if content.endswith('```'):
-                    content = content[:-3]
-                
-                result = json.loads(content)
+                try:
+                    result = _json.loads(str(content))
+                except _json.JSONDecodeError as e:
+                    parse_error = str(e)
+                else:
+                    # Validate result structure
+                    parse_error = None
+                    if not isinstance(result, dict) or 'fields' not in result:
+                        parse_error = "Response missing 'fields' key"
                 
-                # Validate result structure
-                if 'fields' not in result:
-                    raise ValueError("Response missing 'fields' key")
+                if parse_error is not None:
+                    # Malformed output won't improve on a deterministic retry
+                    last_error = f"JSON parsing error: {parse_error}"
+                    print(f"Attempt {attempt + 1} failed: {last_error}")
+                    break
                 
                 # Post-process and validate fields
                 processed_fields = self.post_process_fields(result['fields'], doc_type)
                 
+                if self.cache:
+                    self.cache.set(cache_key, _json.dumps(processed_fields))
+                
                 return {
                     'fields': processed_fields,
                     'extraction_metadata': {
@@ -169,11 +266,6 @@ Remember to:
                     }
                 }
                 
-            except json.JSONDecodeError as e:
-                last_error = f"JSON parsing error: {e}"
-                print(f"Attempt {attempt + 1} failed: {last_error}")
-                continue
-                
             except Exception as e:
                 last_error = f"Extraction error: {e}"
                 print(f"Attempt {attempt + 1} failed: {last_error}")
@@ -184,30 +276,39 @@ Remember to:
             'fields': [],
             'extraction_metadata': {
                 'model': self.llm.model_name,
-                'attempts': max_retries,
+                'attempts': attempts,
                 'error': last_error,
                 'doc_type': doc_type
             }
         }
     
+    async def extract_async(
+        self, 
+        text_content: str, 
+        doc_type: str, 
+        custom_fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Run extract_structured_data on a worker thread so it can be awaited alongside other LLM calls"""
+        return await asyncio.to_thread(self.extract_structured_data, text_content, doc_type, custom_fields)
+    
     def post_process_fields(self, fields: List[Dict], doc_type: str) -> List[Dict]:
         """Post-process extracted fields for consistency and validation"""
-        
-        processed_fields = []
-        
-        for field in fields:
-            processed_field = {
-                'name': field.get('name', ''),
-                'value': field.get('value'),
-                'confidence': max(0.0, min(1.0, float(field.get('confidence', 0)))),
-                'source': field.get('source', {'page': 1, 'bbox': [0, 0, 100, 20]})
+        finalize = self._finalize_field
+        return [finalize(field, doc_type) for field in fields]
+    
+    def _finalize_field(self, field: Dict, doc_type: str) -> Dict:
+        """Normalize a raw LLM field and apply type-specific validation in a single step"""
+        processed_field = {
+            'name': field.get('name', ''),
+            'value': field.get('value'),
+            'confidence': max(0.0, min(1.0, float(field.get('confidence', 0)))),
+            'source': field['source'] if 'source' in field else {
+                'page': _DEFAULT_SOURCE['page'], 'bbox': list(_DEFAULT_SOURCE['bbox'])
             }
-            
-            # Type-specific post-processing
-            processed_field = self.apply_field_validation(processed_field, doc_type)
-            processed_fields.append(processed_field)
+        }
         
-        return processed_fields
+        # Type-specific post-processing
+        return self.apply_field_validation(processed_field, doc_type)
     
     def apply_field_validation(self, field: Dict, doc_type: str) -> Dict:
         """Apply field-specific validation and formatting"""
@@ -218,9 +319,11 @@ Remember to:
         if not value:
             return field
         
+        categories = _field_categories(field_name)
+        
         try:
             # Date fields
-            if 'date' in field_name:
+            if 'date' in categories:
                 formatted_date = self.normalize_date(str(value))
                 if formatted_date:
                     field['value'] = formatted_date
@@ -228,7 +331,7 @@ Remember to:
                     field['confidence'] *= 0.7  # Reduce confidence for invalid dates
             
             # Amount fields
-            elif any(keyword in field_name for keyword in ['amount', 'total', 'subtotal', 'tax', 'paid', 'charges']):
+            elif 'amount' in categories:
                 normalized_amount = self.normalize_amount(str(value))
                 if normalized_amount is not None:
                     field['value'] = normalized_amount
@@ -236,7 +339,7 @@ Remember to:
                     field['confidence'] *= 0.6  # Reduce confidence for invalid amounts
             
             # Phone number fields
-            elif 'phone' in field_name:
+            elif 'phone' in categories:
                 normalized_phone = self.normalize_phone(str(value))
                 if normalized_phone:
                     field['value'] = normalized_phone
@@ -252,16 +355,8 @@ Remember to:
         if not date_str:
             return None
         
-        # Common date patterns
-        date_patterns = [
-            r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # MM/DD/YYYY
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # MM-DD-YYYY
-            r'(\d{1,2})\.(\d{1,2})\.(\d{4})', # MM.DD.YYYY
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, date_str)
+        for pattern in _DATE_PATTERNS:
+            match = pattern.search(date_str)
             if match:
                 groups = match.groups()
                 if len(groups) == 3:
@@ -286,7 +381,7 @@ Remember to:
             return None
         
         # Remove common currency symbols and formatting
-        cleaned = re.sub(r'[$€£¥,\s]', '', str(amount_str))
+        cleaned = _CURRENCY_RE.sub('', str(amount_str))
         
         # Handle negative amounts in parentheses
         if cleaned.startswith('(') and cleaned.endswith(')'):
@@ -303,7 +398,7 @@ Remember to:
             return None
         
         # Extract digits only
-        digits = re.sub(r'\D', '', phone_str)
+        digits = _NONDIGIT_RE.sub('', phone_str)
         
         if len(digits) == 10:
             return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
@@ -1,91 +1,377 @@
-import io
+import os
+import json
+import hashlib
+import tempfile
+import threading
 import fitz  # PyMuPDF
-from PIL import Image
-import pytesseract
 import cv2
 import numpy as np
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from ._llm_cache import CACHE_DIR
+from ._image_kernels import fused_median_threshold, histogram, histogram_std, otsu_threshold
+
+try:
+    import tesserocr
+except ImportError:  # Optional dependency; falls back to the pytesseract CLI wrapper
+    tesserocr = None
+
+# Bump whenever OCR output for the same input can change so stale results are not served
+_OCR_CACHE_VERSION = "v3"
+_OCR_CACHE_DIR = os.path.join(CACHE_DIR, "ocr")
+
+# libtiff compression code for LZW
+_TIFF_COMPRESSION_LZW = 5
+
+# Tesseract can stall on very long multi-page inputs; split larger batches
+_MAX_OCR_BATCH_PAGES = 50
+
+# OCR worker threads: half the cores, since Tesseract itself may use several threads per process
+_OCR_WORKERS = max(1, (os.cpu_count() or 1) // 2)
+
+# PDFs larger than this are opened from a temporary file rather than from memory
+_PDF_TEMPFILE_MIN_BYTES = 10 * 1024 * 1024
+
+# Plain text extraction: no ligature preservation or reading-order sort, clipped to the page
+_PDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# Scanned PDFs with at most this many pages are OCRed on the calling thread
+_SEQUENTIAL_OCR_MAX_PAGES = 2
+
+# Threshold statistics are taken from every 4th pixel of pages at least this large
+_HISTOGRAM_STEP = 4
+_HISTOGRAM_MIN_SIDE = 400
+
+# Pages whose intensity standard deviation is below this are treated as clean scans
+_NOISE_STD_THRESHOLD = 40.0
+
+# Default resolution for rendering scanned pages for OCR (used for vector-only pages)
+_OCR_RENDER_DPI = 200
+# Scanned pages render at their embedded image resolution, capped here; more adds no detail
+_OCR_MAX_DPI = 300
+
+# A PDF counts as born-digital when more than 80% of its pages carry over 50 chars of text
+_TEXT_PAGE_MIN_CHARS = 50
+_TEXT_LAYER_PAGE_RATIO = 0.8
+
+# Table line detection runs at 1/4 resolution on images large enough to afford it
+_TABLE_DETECTION_SCALE = 4
+_TABLE_DETECTION_MIN_SIDE = 400
 
 class OCRProcessor:
     """Handles OCR processing for PDFs and images with table detection"""
     
-    def __init__(self):
+    def __init__(self, pdf_dpi: int = _OCR_RENDER_DPI, noise_threshold: float = _NOISE_STD_THRESHOLD):
         # Configure tesseract if needed
         self.tesseract_config = '--oem 3 --psm 6'
+        # Resolution for rasterizing vector-only PDF pages; lower is faster, higher reads small print better
+        self.pdf_dpi = pdf_dpi
+        # Intensity standard deviation above which a page is median-filtered before thresholding
+        self.noise_threshold = noise_threshold
+        # One resident tesserocr engine per worker thread; engines are not thread-safe
+        self._tess_local = threading.local()
+        self._tesserocr_failed = False
         
-    def extract_text_from_pdf(self, pdf_content: bytes) -> str:
-        """Extract text from PDF using PyMuPDF"""
+    def extract_text_from_pdf(self, pdf_content: bytes, max_chars: Optional[int] = None) -> str:
+        """Extract text from PDF using PyMuPDF, stopping once max_chars of text have been read"""
+        pdf_path = None
+        pdf_document = None
         try:
-            # Open PDF from bytes
-            pdf_document = fitz.open(stream=pdf_content, filetype="pdf")
-            text_content = ""
+            if len(pdf_content) > _PDF_TEMPFILE_MIN_BYTES:
+                # Open large PDFs by path so MuPDF reads from the page cache instead of
+                # copying the whole buffer into its own heap
+                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as pdf_file:
+                    pdf_file.write(pdf_content)
+                    pdf_path = pdf_file.name
+                pdf_document = fitz.open(pdf_path)
+            else:
+                # Open PDF from bytes
+                pdf_document = fitz.open(stream=pdf_content, filetype="pdf")
+            page_texts = []
+            total_chars = 0
             
+            # First pass: embedded text layer only
             for page_num in range(pdf_document.page_count):
                 page = pdf_document[page_num]
                 # Extract text - compatible with different PyMuPDF versions
                 page_text = ""
                 try:
-                    page_text = page.get_text()
+                    page_text = page.get_text("text", flags=_PDF_TEXT_FLAGS, sort=False)
                 except AttributeError:
                     # Fallback for older versions
                     page_text = page.getText() if hasattr(page, 'getText') else ""
                 
-                text_content += page_text
+                page_texts.append(page_text)
                 
-                # If no text found, try OCR on the page
-                if not page_text.strip():
+                # Downstream stages only look at the first max_chars; skip the remaining pages
+                total_chars += len(page_text)
+                if max_chars is not None and total_chars >= max_chars:
+                    break
+            
+            # Documents that are mostly born-digital skip OCR entirely
+            text_pages = sum(1 for page_text in page_texts if len(page_text) > _TEXT_PAGE_MIN_CHARS)
+            if text_pages > _TEXT_LAYER_PAGE_RATIO * len(page_texts):
+                return "".join(page_texts)
+            
+            # Second pass: render and OCR pages without a text layer in page order, a chunk at a
+            # time, so scanned documents also stop once max_chars of text have been read.
+            # Rendering stays on this thread because a PyMuPDF document must not be shared
+            # across threads.
+            scanned_page_nums = [page_num for page_num, page_text in enumerate(page_texts) if not page_text.strip()]
+            if max_chars is None:
+                chunk_size = max(1, len(scanned_page_nums))
+            else:
+                # Enough pages for a full-size batch per worker, so batching is the same as unbudgeted
+                chunk_size = _OCR_WORKERS * _MAX_OCR_BATCH_PAGES
+            
+            budget_met = False
+            for start in range(0, len(scanned_page_nums), chunk_size):
+                scanned_pages = []  # (page_num, grayscale array)
+                for page_num in scanned_page_nums[start:start + chunk_size]:
                     try:
-                        pix = page.get_pixmap() if hasattr(page, 'get_pixmap') else page.getPixmap()
-                        img_data = pix.tobytes("png") if hasattr(pix, 'tobytes') else pix.getImageData("png")
-                        ocr_text = self.extract_text_from_image(img_data)
-                        text_content += f"\n[OCR Page {page_num + 1}]\n{ocr_text}\n"
+                        # Render straight to 8-bit grayscale; no PNG encode/decode round-trip
+                        page = pdf_document[page_num]
+                        zoom = self._render_dpi(page) / 72
+                        pix = page.get_pixmap(
+                            matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False
+                        )
+                        scanned_pages.append((page_num, self.pixmap_to_gray(pix)))
                     except Exception as ocr_error:
                         print(f"OCR failed for page {page_num + 1}: {ocr_error}")
+                
+                # Release the document before the last (long) OCR step
+                if start + chunk_size >= len(scanned_page_nums):
+                    self._close_pdf(pdf_document)
+                
+                # Batches arrive in page order, so the budget is checked after each one
+                for batch in self._iter_ocr_batches(scanned_pages):
+                    for page_num, ocr_text in batch:
+                        if ocr_text is not None:
+                            ocr_page_text = f"\n[OCR Page {page_num + 1}]\n{ocr_text}\n"
+                            page_texts[page_num] += ocr_page_text
+                            total_chars += len(ocr_page_text)
+                    
+                    budget_met = max_chars is not None and total_chars >= max_chars
+                    if budget_met:
+                        break
+                
+                if budget_met:
+                    break
             
-            pdf_document.close()
-            return text_content
+            return "".join(page_texts)
             
         except Exception as e:
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
+        
+        finally:
+            if pdf_document is not None:
+                self._close_pdf(pdf_document)
+            if pdf_path is not None:
+                os.unlink(pdf_path)
+    
+    def _render_dpi(self, page: "fitz.Page") -> float:
+        """Pick the OCR render resolution from the page's embedded images"""
+        image_dpis = [
+            info['width'] * 72 / (info['bbox'][2] - info['bbox'][0])
+            for info in page.get_image_info()
+            if info['bbox'][2] > info['bbox'][0]
+        ]
+        if not image_dpis:
+            return self.pdf_dpi  # Vector-only page
+        
+        # Rendering a scan above its native resolution only interpolates pixels
+        return min(_OCR_MAX_DPI, max(image_dpis))
+    
+    def _close_pdf(self, pdf_document: "fitz.Document") -> None:
+        """Close a document unless an earlier step already closed it"""
+        if not pdf_document.is_closed:
+            pdf_document.close()
+    
+    def ocr_pages(self, pages: List[Tuple[int, np.ndarray]]) -> List[Tuple[int, Optional[str]]]:
+        """OCR rendered page images in parallel; Tesseract runs outside the GIL"""
+        return [result for batch in self._iter_ocr_batches(pages) for result in batch]
+    
+    def _iter_ocr_batches(self, pages: List[Tuple[int, np.ndarray]]) -> Iterator[List[Tuple[int, Optional[str]]]]:
+        """OCR pages in multi-page batches, yielding each batch's results in page order"""
+        if not pages:
+            return
+        
+        # Pool spin-up is not worth it for tiny documents
+        if len(pages) <= _SEQUENTIAL_OCR_MAX_PAGES:
+            yield self._ocr_batch(pages)
+            return
+        
+        # One multi-page Tesseract call per worker instead of one process per page
+        max_workers = min(_OCR_WORKERS, len(pages))
+        batch_size = min(-(-len(pages) // max_workers), _MAX_OCR_BATCH_PAGES)
+        batches = [pages[i:i + batch_size] for i in range(0, len(pages), batch_size)]
+        
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(batches)))
+        try:
+            yield from executor.map(self._ocr_batch, batches)
+        finally:
+            # A caller that stops early does not wait for batches that have not started
+            executor.shutdown(wait=True, cancel_futures=True)
     
-    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
-        """Preprocess image for better OCR results"""
+    def _ocr_batch(self, pages: List[Tuple[int, np.ndarray]]) -> List[Tuple[int, Optional[str]]]:
+        """OCR several pages with a single Tesseract invocation via a multi-page TIFF"""
+        import pytesseract  # Imported lazily so text-only PDFs never load it
+        
+        # A resident tesserocr engine has no per-call startup cost to amortize
+        if len(pages) == 1 or self._tesserocr_api() is not None:
+            return [self._ocr_page(page) for page in pages]
+        
+        tiff_path = None
         try:
-            # Convert to grayscale
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            images = [self.preprocess_image(gray) for _, gray in pages]
+            
+            with tempfile.NamedTemporaryFile(suffix='.tif', delete=False) as tiff_file:
+                tiff_path = tiff_file.name
+            if not cv2.imwritemulti(tiff_path, images, [cv2.IMWRITE_TIFF_COMPRESSION, _TIFF_COMPRESSION_LZW]):
+                raise ValueError("could not write multi-page TIFF")
+            
+            # Tesseract terminates each page of a multi-page image with a form feed
+            page_texts = pytesseract.image_to_string(tiff_path, config=self.tesseract_config).split('\f')
+            if len(page_texts) < len(pages):
+                raise ValueError(f"expected {len(pages)} pages of OCR output, got {len(page_texts)}")
+            
+            return [(page_num, text.strip()) for (page_num, _), text in zip(pages, page_texts)]
+        
+        except Exception as batch_error:
+            print(f"Batch OCR failed, falling back to per-page OCR: {batch_error}")
+            return [self._ocr_page(page) for page in pages]
+        
+        finally:
+            if tiff_path:
+                os.unlink(tiff_path)
+    
+    def _ocr_page(self, page: Tuple[int, np.ndarray]) -> Tuple[int, Optional[str]]:
+        """OCR a single rendered page, returning None for the text on failure"""
+        page_num, gray = page
+        try:
+            return page_num, self._ocr_gray(gray)
+        except Exception as ocr_error:
+            print(f"OCR failed for page {page_num + 1}: {ocr_error}")
+            return page_num, None
+    
+    def preprocess_image(self, gray: np.ndarray) -> np.ndarray:
+        """Preprocess a grayscale image for better OCR results"""
+        try:
+            # One histogram serves both the noise estimate and Otsu's threshold. Large pages are
+            # sampled every 4th pixel; the statistics barely move, and plain subsampling (unlike
+            # INTER_AREA averaging) keeps the pixel noise the std check relies on
+            step = _HISTOGRAM_STEP if min(gray.shape) >= _HISTOGRAM_MIN_SIDE else 1
+            hist = histogram(gray[::step, ::step])
+            threshold = otsu_threshold(hist)
+            
+            # Clean scans skip the median filter; it costs time and can erode thin strokes
+            if histogram_std(hist) < self.noise_threshold:
+                _, thresh = cv2.threshold(gray, threshold, 255, cv2.THRESH_BINARY)
+                return thresh
+            
+            # Median blur + threshold fused into a single pass when Numba is available
+            fused = fused_median_threshold(gray, threshold)
+            if fused is not None:
+                return fused
             
             # Apply noise reduction
             denoised = cv2.medianBlur(gray, 3)
             
             # Apply threshold to get binary image
-            _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            # Morphological operations to clean up the image
-            kernel = np.ones((1, 1), np.uint8)
-            cleaned = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+            _, thresh = cv2.threshold(denoised, threshold, 255, cv2.THRESH_BINARY)
             
-            return cleaned
+            return thresh
             
         except Exception as e:
             print(f"Image preprocessing failed: {e}")
-            return image
+            return gray
+    
+    def decode_grayscale(self, image_content: bytes) -> np.ndarray:
+        """Decode image bytes directly to a grayscale array with OpenCV"""
+        gray = cv2.imdecode(np.frombuffer(image_content, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError("Unsupported or corrupt image data")
+        return gray
+    
+    def _tesserocr_api(self) -> Optional["tesserocr.PyTessBaseAPI"]:
+        """Return this thread's tesserocr engine, or None when tesserocr cannot be used"""
+        if tesserocr is None or self._tesserocr_failed:
+            return None
+        
+        api = getattr(self._tess_local, 'api', None)
+        if api is None:
+            try:
+                # Same settings as tesseract_config: --oem 3 --psm 6
+                api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_BLOCK, oem=tesserocr.OEM.DEFAULT)
+            except RuntimeError as e:
+                print(f"tesserocr initialization failed, using pytesseract: {e}")
+                self._tesserocr_failed = True
+                return None
+            self._tess_local.api = api
+        return api
+    
+    def image_to_string(self, image: np.ndarray) -> str:
+        """Run Tesseract on an 8-bit grayscale image, in-process when tesserocr is available"""
+        api = self._tesserocr_api()
+        if api is not None:
+            image = np.ascontiguousarray(image)
+            height, width = image.shape
+            api.SetImageBytes(image.tobytes(), width, height, 1, width)
+            return api.GetUTF8Text()
+        
+        import pytesseract
+        return pytesseract.image_to_string(image, config=self.tesseract_config)
+    
+    def image_regions_to_string(self, image: np.ndarray, regions: List[List[int]]) -> List[str]:
+        """OCR several (x, y, w, h) regions of one grayscale image"""
+        api = self._tesserocr_api()
+        if api is None:
+            return [self.image_to_string(image[y:y+h, x:x+w]) for x, y, w, h in regions]
+        
+        # Upload the page once and move the recognition rectangle instead of cropping
+        image = np.ascontiguousarray(image)
+        height, width = image.shape
+        api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        texts = []
+        for x, y, w, h in regions:
+            api.SetRectangle(x, y, w, h)
+            texts.append(api.GetUTF8Text())
+        return texts
+    
+    def _ocr_gray(self, gray: np.ndarray) -> str:
+        """Preprocess a grayscale image and run Tesseract on it"""
+        processed_image = self.preprocess_image(gray)
+        
+        # Perform OCR
+        text = self.image_to_string(processed_image)
+        
+        return text.strip()
+    
+    def pixmap_to_gray(self, pix: "fitz.Pixmap") -> np.ndarray:
+        """Wrap a PyMuPDF pixmap's raw samples as a grayscale array without re-encoding"""
+        if pix.n == 1:
+            return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+        
+        pixels = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        if pix.n == 2:  # Gray + alpha
+            return np.ascontiguousarray(pixels[:, :, 0])
+        if pix.n == 4:
+            return cv2.cvtColor(pixels, cv2.COLOR_RGBA2GRAY)
+        return cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+    
+    def extract_text_from_pixmap(self, pix: "fitz.Pixmap") -> str:
+        """Extract text from a rendered PyMuPDF pixmap using Tesseract OCR"""
+        try:
+            return self._ocr_gray(self.pixmap_to_gray(pix))
+        
+        except Exception as e:
+            raise Exception(f"Failed to extract text from pixmap: {str(e)}")
     
     def extract_text_from_image(self, image_content: bytes) -> str:
         """Extract text from image using Tesseract OCR"""
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_content))
-            
-            # Convert PIL to OpenCV format
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            
-            # Preprocess the image
-            processed_image = self.preprocess_image(opencv_image)
-            
-            # Perform OCR
-            text = pytesseract.image_to_string(processed_image, config=self.tesseract_config)
-            
-            return text.strip()
+            return self._ocr_gray(self.decode_grayscale(image_content))
             
         except Exception as e:
             raise Exception(f"Failed to extract text from image: {str(e)}")
@@ -93,46 +379,86 @@ class OCRProcessor:
     def detect_tables(self, image_content: bytes) -> List[Dict[str, Any]]:
         """Detect and extract tables from images"""
         try:
-            # Convert bytes to PIL Image
-            image = Image.open(io.BytesIO(image_content))
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            gray = cv2.cvtColor(opencv_image, cv2.COLOR_BGR2GRAY)
+            gray = self.decode_grayscale(image_content)
+            
+            # Line localization only needs a coarse image; run it on a downsampled copy
+            scale = _TABLE_DETECTION_SCALE if min(gray.shape) >= _TABLE_DETECTION_MIN_SIDE else 1
+            small = gray if scale == 1 else cv2.resize(
+                gray, None, fx=1 / scale, fy=1 / scale, interpolation=cv2.INTER_AREA
+            )
+            line_length = 40 // scale
             
             # Detect horizontal and vertical lines
-            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 1))
-            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 40))
+            horizontal_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (line_length, 1))
+            vertical_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, line_length))
+            
+            # Binarize with ink as foreground so the openings keep the ruling lines themselves
+            _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
             
             # Detect horizontal lines
-            horizontal_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, horizontal_kernel)
+            horizontal_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, horizontal_kernel)
             
             # Detect vertical lines
-            vertical_lines = cv2.morphologyEx(gray, cv2.MORPH_OPEN, vertical_kernel)
+            vertical_lines = cv2.morphologyEx(binary, cv2.MORPH_OPEN, vertical_kernel)
             
-            # Combine lines
-            table_mask = cv2.addWeighted(horizontal_lines, 0.5, vertical_lines, 0.5, 0.0)
+            # Combine lines: a pixel belongs to the grid if it is on either kind of line
+            table_mask = cv2.max(horizontal_lines, vertical_lines)
             
-            # Find contours (potential table regions)
-            contours, _ = cv2.findContours(table_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Find connected regions (potential table regions); one C call returns every bbox
+            _, _, stats, _ = cv2.connectedComponentsWithStats(table_mask, connectivity=8)
             
-            tables = []
-            for i, contour in enumerate(contours):
-                x, y, w, h = cv2.boundingRect(contour)
-                if w > 100 and h > 50:  # Filter small contours
-                    table_roi = opencv_image[y:y+h, x:x+w]
-                    table_text = pytesseract.image_to_string(table_roi, config=self.tesseract_config)
-                    
-                    tables.append({
-                        'table_id': i,
-                        'bbox': [x, y, x+w, y+h],
-                        'text': table_text.strip()
-                    })
+            # Map the bounding boxes back to full resolution and filter small regions with
+            # one vectorized mask; label 0 is the background
+            boxes = stats[1:, :4].astype(np.int64) * scale
+            boxes[:, 2] = np.minimum(boxes[:, 2], gray.shape[1] - boxes[:, 0])
+            boxes[:, 3] = np.minimum(boxes[:, 3], gray.shape[0] - boxes[:, 1])
+            keep = np.flatnonzero((boxes[:, 2] > 100) & (boxes[:, 3] > 50))
+            
+            regions = boxes[keep].tolist()
+            region_texts = self.image_regions_to_string(gray, regions)
             
-            return tables
+            return [
+                {
+                    'table_id': i,
+                    'bbox': [x, y, x+w, y+h],
+                    'text': table_text.strip()
+                }
+                for i, (x, y, w, h), table_text in zip(keep.tolist(), regions, region_texts)
+            ]
             
         except Exception as e:
             print(f"Table detection failed: {e}")
             return []
     
+    def _ocr_cache_path(self, content: bytes, method: str) -> str:
+        """Content-addressed cache file for OCR output under the current settings"""
+        digest = hashlib.sha256(content)
+        digest.update(f"\x1f{_OCR_CACHE_VERSION}\x1f{method}\x1f{self.tesseract_config}"
+                      f"\x1f{self.pdf_dpi}\x1f{self.noise_threshold}".encode("utf-8"))
+        return os.path.join(_OCR_CACHE_DIR, f"{digest.hexdigest()}.json")
+    
+    def _load_cached_content(self, path: str) -> Optional[Dict[str, Any]]:
+        """Read a cached OCR result, or None on a miss"""
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"OCR cache read failed: {e}")
+            return None
+    
+    def _store_cached_content(self, path: str, result: Dict[str, Any]) -> None:
+        """Write an OCR result atomically so concurrent readers never see a partial file"""
+        try:
+            os.makedirs(_OCR_CACHE_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=_OCR_CACHE_DIR, suffix=".tmp",
+                                             delete=False, encoding="utf-8") as tmp_file:
+                json.dump(result, tmp_file)
+            os.replace(tmp_file.name, path)
+        except OSError as e:
+            print(f"OCR cache write failed: {e}")
+    
     def extract_structured_content(self, content: bytes, filename: str) -> Dict[str, Any]:
         """Extract structured content including text and tables"""
         try:
@@ -145,14 +471,24 @@ class OCRProcessor:
                 }
             }
             
-            if filename.lower().endswith('.pdf'):
+            method = 'pdf_extraction' if filename.lower().endswith('.pdf') else 'ocr_image'
+            result['metadata']['processing_method'] = method
+            
+            # Re-uploads of the same file skip OCR entirely
+            cache_path = self._ocr_cache_path(content, method)
+            cached = self._load_cached_content(cache_path)
+            if cached is not None:
+                result['text'] = cached['text']
+                result['tables'] = cached['tables']
+                return result
+            
+            if method == 'pdf_extraction':
                 result['text'] = self.extract_text_from_pdf(content)
-                result['metadata']['processing_method'] = 'pdf_extraction'
             else:
                 result['text'] = self.extract_text_from_image(content)
                 result['tables'] = self.detect_tables(content)
-                result['metadata']['processing_method'] = 'ocr_image'
             
+            self._store_cached_content(cache_path, {'text': result['text'], 'tables': result['tables']})
             return result
             
         except Exception as e:
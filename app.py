@@ -7,6 +7,12 @@ from agents.document_processor import DocumentProcessor
 from agents.extraction_agent import ExtractionAgent
 from utils.confidence_scoring import ConfidenceScorer
 from utils.file_handlers import FileHandler
+from models.schemas import FieldsTable
+
+try:
+    import orjson
+except ImportError:  # Optional dependency
+    orjson = None
 
 # Configure page
 st.set_page_config(
@@ -16,10 +22,52 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+class PipelineError(Exception):
+    """Carries a failed pipeline result out of the cached runner so it is not cached"""
+    
+    def __init__(self, result):
+        super().__init__(result.get("error", "processing failed"))
+        self.result = result
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def run_pipeline(file_content, filename, enable_ocr, custom_fields, model_choice, confidence_threshold):
+    """Run the full pipeline; repeat clicks and re-uploads of the same bytes hit the cache"""
+    doc_processor = DocumentProcessor()
+    extraction_agent = ExtractionAgent(model=model_choice)
+    confidence_scorer = ConfidenceScorer()
+    
+    result = doc_processor.process_document(
+        file_content=file_content,
+        filename=filename,
+        enable_ocr=enable_ocr,
+        custom_fields=list(custom_fields),
+        extraction_agent=extraction_agent,
+        confidence_scorer=confidence_scorer,
+        confidence_threshold=confidence_threshold
+    )
+    
+    # Exceptions are never cached, so failures are retried on the next click
+    if result.get("error"):
+        raise PipelineError(result)
+    return result
+
+def format_result_json(result):
+    """Pretty-print a result as JSON, with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            pass  # e.g. non-string keys; the stdlib encoder handles those
+    return json.dumps(result, indent=2, ensure_ascii=False)
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'processed_result' not in st.session_state:
         st.session_state.processed_result = None
+    if 'result_json' not in st.session_state:
+        st.session_state.result_json = None
+    if 'result_csv' not in st.session_state:
+        st.session_state.result_csv = None
     if 'processing' not in st.session_state:
         st.session_state.processing = False
 
@@ -27,11 +75,8 @@ def display_confidence_bars(fields_data):
     """Display confidence bars for each field"""
     st.subheader("Field Confidence Scores")
     
-    for field in fields_data:
-        confidence = field.get('confidence', 0)
-        name = field.get('name', 'Unknown')
-        value = field.get('value', 'N/A')
-        
+    table = FieldsTable.from_fields(fields_data)
+    for name, value, confidence in zip(table.names, table.values, table.confidences):
         col1, col2, col3 = st.columns([2, 2, 1])
         
         with col1:
@@ -138,28 +183,38 @@ def main():
                     try:
                         # Initialize processors
                         file_handler = FileHandler()
-                        doc_processor = DocumentProcessor()
-                        extraction_agent = ExtractionAgent(model=model_choice)
-                        confidence_scorer = ConfidenceScorer()
+                        
+                        # Validate first; image bytes read here are reused by process_uploaded_file
+                        validation = file_handler.validate_file_for_processing(uploaded_file)
+                        for warning in validation['warnings']:
+                            st.warning(warning)
+                        if not validation['is_valid']:
+                            raise ValueError("; ".join(validation['errors']))
                         
                         # Process the uploaded file
-                        file_content = file_handler.process_uploaded_file(uploaded_file)
+                        file_content = file_handler.process_uploaded_file(
+                            uploaded_file, metadata=validation['metadata']
+                        )
                         
                         # Parse custom fields
                         custom_field_list = [field.strip() for field in custom_fields.split('\n') if field.strip()] if custom_fields else []
                         
-                        # Run the complete processing pipeline
-                        result = doc_processor.process_document(
-                            file_content=file_content,
-                            filename=uploaded_file.name,
-                            enable_ocr=enable_ocr,
-                            custom_fields=custom_field_list,
-                            extraction_agent=extraction_agent,
-                            confidence_scorer=confidence_scorer,
-                            confidence_threshold=confidence_threshold
-                        )
+                        # Run the complete processing pipeline (cached by content and settings)
+                        try:
+                            result = run_pipeline(
+                                file_content,
+                                uploaded_file.name,
+                                enable_ocr,
+                                tuple(custom_field_list),
+                                model_choice,
+                                confidence_threshold
+                            )
+                        except PipelineError as pipeline_error:
+                            result = pipeline_error.result
                         
                         st.session_state.processed_result = result
+                        st.session_state.result_json = None
+                        st.session_state.result_csv = None
                         st.session_state.processing = False
                         st.success("Document processed successfully!")
                         st.rerun()
@@ -199,8 +254,10 @@ def main():
             # JSON output
             st.subheader("Extracted Data (JSON)")
             
-            # Format JSON for display
-            formatted_json = json.dumps(result, indent=2, ensure_ascii=False)
+            # Format JSON for display once per result; widget reruns reuse the string
+            if st.session_state.result_json is None:
+                st.session_state.result_json = format_result_json(result)
+            formatted_json = st.session_state.result_json
             st.code(formatted_json, language='json')
             
             # Download buttons
@@ -218,11 +275,12 @@ def main():
             with download_col2:
                 # Create CSV for tabular view
                 if fields_data and uploaded_file is not None:
-                    df = pd.DataFrame(fields_data)
-                    csv = df.to_csv(index=False)
+                    # Built once per result rather than on every widget rerun
+                    if st.session_state.result_csv is None:
+                        st.session_state.result_csv = pd.DataFrame(fields_data).to_csv(index=False)
                     st.download_button(
                         label="📊 Download CSV",
-                        data=csv,
+                        data=st.session_state.result_csv,
                         file_name=f"extracted_fields_{uploaded_file.name}.csv",
                         mime="text/csv"
                     )
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+import numpy as np
 
 class FieldExtraction(BaseModel):
     """Base model for extracted field information"""
@@ -9,6 +10,26 @@ class FieldExtraction(BaseModel):
     confidence: float = Field(ge=0.0, le=1.0, description="Confidence score between 0 and 1")
     source: Dict[str, Any] = Field(description="Source information including page and bbox coordinates")
 
+class FieldsTable(BaseModel):
+    """Column-oriented (struct-of-arrays) view of extracted fields for display and filtering"""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    
+    names: List[str] = Field(default_factory=list, description="Field names")
+    values: List[Any] = Field(default_factory=list, description="Field values, aligned with names")
+    confidences: np.ndarray = Field(
+        default_factory=lambda: np.zeros(0),
+        description="Confidence scores as a float array, aligned with names"
+    )
+    
+    @classmethod
+    def from_fields(cls, fields: List[Dict[str, Any]]) -> "FieldsTable":
+        """Build the columns from the pipeline's list of field dicts"""
+        return cls.model_construct(
+            names=[field.get('name', 'Unknown') for field in fields],
+            values=[field.get('value', 'N/A') for field in fields],
+            confidences=np.array([field.get('confidence', 0) for field in fields], dtype=np.float64)
+        )
+
 class LineItem(BaseModel):
     """Model for invoice line items"""
     description: Optional[str] = Field(description="Item description")
@@ -42,7 +63,7 @@ class InvoiceSchema(BaseModel):
     tax_amount: Optional[float] = Field(description="Tax amount")
     total_amount: Optional[float] = Field(description="Total amount")
     currency: Optional[str] = Field(description="Currency code")
-    line_items: List[LineItem] = Field(default=[], description="List of line items")
+    line_items: List[LineItem] = Field(default_factory=list, description="List of line items")
 
 class MedicalBillSchema(BaseModel):
     """Schema for medical bill document extraction"""
@@ -53,7 +74,7 @@ class MedicalBillSchema(BaseModel):
     provider_address: Optional[str] = Field(description="Provider address")
     service_date: Optional[str] = Field(description="Date of service")
     diagnosis: Optional[str] = Field(description="Primary diagnosis")
-    procedures: List[MedicalProcedure] = Field(default=[], description="List of procedures")
+    procedures: List[MedicalProcedure] = Field(default_factory=list, description="List of procedures")
     insurance_company: Optional[str] = Field(description="Insurance company name")
     policy_number: Optional[str] = Field(description="Insurance policy number")
     total_charges: Optional[float] = Field(description="Total charges")
@@ -72,7 +93,7 @@ class PrescriptionSchema(BaseModel):
     pharmacy_phone: Optional[str] = Field(description="Pharmacy phone number")
     prescription_date: Optional[str] = Field(description="Prescription date")
     prescription_number: Optional[str] = Field(description="Prescription number")
-    medications: List[Medication] = Field(default=[], description="List of medications")
+    medications: List[Medication] = Field(default_factory=list, description="List of medications")
     refills: Optional[int] = Field(description="Number of refills allowed")
     doctor_signature: Optional[str] = Field(description="Doctor signature status")
 
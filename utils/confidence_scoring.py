@@ -1,8 +1,191 @@
 import re
 import math
-from typing import Dict, List, Any, Optional
+import bisect
+import hashlib
+import functools
+import threading
+from typing import Dict, List, Any, Optional, Iterable, Tuple
 import numpy as np
-from collections import Counter
+from collections import Counter, OrderedDict
+
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency
+    ahocorasick = None
+
+# Common OCR errors fused into one scan; the character classes are disjoint, so each
+# named group matches exactly when its standalone pattern would
+_OCR_ERROR_RE = re.compile(
+    r'(?P<pipes>\|{2,})'  # Multiple pipes (common OCR error)
+    r'|(?P<zeros>[0O]{3,})'  # Multiple O's or 0's
+    r'|(?P<ones>[Il1]{3,})'  # Multiple similar characters
+    r'|(?P<specials>[@#$%^&*]{2,})'  # Multiple special characters
+    r'|(?P<spaces>\s{3,})'  # Excessive whitespace
+)
+_MIXED_ALNUM_RE = re.compile(r'\d+[A-Za-z]+\d+')
+_NON_WORD_RE = re.compile(r'[^\w]')
+_DIGIT_RE = re.compile(r'\d')
+_NON_NAME_CHAR_RE = re.compile(r'[^a-zA-Z\s\-\.]')
+_NON_AMOUNT_CHAR_RE = re.compile(r'[^\d.]')
+_CURRENCY_CHAR_RE = re.compile(r'[$,€£¥]')
+_DECIMAL_RE = re.compile(r'^\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*$')
+
+_DATE_RES = [re.compile(p) for p in (
+    r'^\d{4}-\d{2}-\d{2}$',  # YYYY-MM-DD
+    r'^\d{1,2}/\d{1,2}/\d{4}$',  # MM/DD/YYYY
+    r'^\d{1,2}-\d{1,2}-\d{4}$',  # MM-DD-YYYY
+)]
+_AMOUNT_RES = [re.compile(p) for p in (
+    r'^\d+\.\d{2}$',  # XX.XX
+    r'^\$?\d{1,3}(,\d{3})*(\.\d{2})?$',  # Currency format
+    r'^\d+$',  # Integer
+)]
+_PHONE_RES = [re.compile(p) for p in (
+    r'^\(\d{3}\) \d{3}-\d{4}$',  # (XXX) XXX-XXXX
+    r'^\d{10}$',  # XXXXXXXXXX
+    r'^\d{3}-\d{3}-\d{4}$',  # XXX-XXX-XXXX
+)]
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Value formats checked for each pattern category, keyed like ConfidenceScorer.pattern_confidence
+_PATTERN_RES = {
+    'date': _DATE_RES,
+    'amount': _AMOUNT_RES,
+    'phone': _PHONE_RES,
+    'email': [_EMAIL_RE]
+}
+
+@functools.lru_cache(maxsize=256)
+def _pattern_category(field_name: str) -> Optional[str]:
+    """Which expected-pattern check applies to a field name; first matching rule wins"""
+    field_name_lower = field_name.lower()
+    if 'date' in field_name_lower:
+        return 'date'
+    if any(keyword in field_name_lower for keyword in ['amount', 'total', 'subtotal', 'tax', 'charge', 'paid']):
+        return 'amount'
+    if 'phone' in field_name_lower:
+        return 'phone'
+    if 'email' in field_name_lower:
+        return 'email'
+    if any(keyword in field_name_lower for keyword in ['id', 'number', 'policy', 'member']):
+        return 'id_number'
+    if 'name' in field_name_lower and 'file' not in field_name_lower:
+        return 'name'
+    return None
+
+# Text clarity multipliers in log space
+_LOG_OCR_ERROR = math.log(0.7)
+_LOG_TOO_SHORT = math.log(0.5)
+_LOG_TOO_LONG = math.log(0.8)
+_LOG_MIXED_ALNUM = math.log(0.8)
+_LOG_PRESENCE = (math.log(0.7), math.log(1.1), math.log(1.2))  # Absent, fuzzy match, exact match
+
+# Document type specific context keywords
+_CONTEXT_KEYWORDS = {
+    'invoice': {
+        'invoice_number': ['invoice', 'inv', '#', 'number'],
+        'total_amount': ['total', 'amount', 'due', '$', 'balance'],
+        'vendor_name': ['from:', 'vendor', 'company', 'bill to'],
+        'invoice_date': ['date', 'issued', 'invoice date'],
+        'due_date': ['due', 'payment due', 'due date']
+    },
+    'medical_bill': {
+        'patient_name': ['patient', 'name', 'member'],
+        'provider_name': ['provider', 'hospital', 'clinic', 'doctor'],
+        'total_charges': ['total', 'charges', 'amount', 'balance'],
+        'service_date': ['service', 'date', 'visit date'],
+        'insurance_company': ['insurance', 'plan', 'coverage']
+    },
+    'prescription': {
+        'patient_name': ['patient', 'name'],
+        'doctor_name': ['doctor', 'physician', 'prescriber', 'md'],
+        'pharmacy_name': ['pharmacy', 'rx', 'dispensed by'],
+        'medications': ['medication', 'drug', 'rx', 'prescribed'],
+        'prescription_date': ['date', 'prescribed', 'rx date']
+    }
+}
+
+def _build_automaton(needles: Iterable[str]) -> Optional["ahocorasick.Automaton"]:
+    """Aho-Corasick automaton reporting each needle, or None when there is nothing to match"""
+    automaton = ahocorasick.Automaton()
+    for needle in needles:
+        automaton.add_word(needle, needle)
+    if len(automaton) == 0:
+        return None
+    automaton.make_automaton()
+    return automaton
+
+# One automaton per document type finds every context keyword in a single sweep
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATA = {
+        doc_type: _build_automaton(kw for keywords in field_keywords.values() for kw in keywords)
+        for doc_type, field_keywords in _CONTEXT_KEYWORDS.items()
+    }
+else:
+    _KEYWORD_AUTOMATA = {}
+
+def _find_occurrences(needles: Iterable[str], text: str, automaton=None) -> Dict[str, List[int]]:
+    """Sorted start offsets of every, possibly overlapping, occurrence of each needle in text"""
+    positions = {needle: [] for needle in needles if needle}
+    if not positions:
+        return positions
+    
+    if ahocorasick is not None:
+        if automaton is None:
+            automaton = _build_automaton(positions)
+        for end, needle in automaton.iter(text):
+            if needle in positions:
+                positions[needle].append(end - len(needle) + 1)
+        return positions
+    
+    for needle, starts in positions.items():
+        pos = text.find(needle)
+        while pos != -1:
+            starts.append(pos)
+            pos = text.find(needle, pos + 1)
+    return positions
+
+@functools.lru_cache(maxsize=1024)
+def _cleaned_charset(text: str) -> frozenset:
+    """Distinct characters of a lowercased, stripped string"""
+    return frozenset(text.lower().strip())
+
+@functools.lru_cache(maxsize=1024)
+def _similarity_pair(str1: str, str2: str) -> float:
+    """Character-set Jaccard similarity of a pair given in sorted order, so (a, b) and (b, a) share an entry"""
+    if str1.lower().strip() == str2.lower().strip():
+        return 1.0
+    
+    chars1 = _cleaned_charset(str1)
+    chars2 = _cleaned_charset(str2)
+    total_chars = chars1 | chars2
+    return len(chars1 & chars2) / len(total_chars) if total_chars else 0.0
+
+def _source_hash(source_text: str) -> bytes:
+    """Short digest identifying a document's source text"""
+    return hashlib.blake2b(source_text.encode('utf-8', 'surrogatepass'), digest_size=8).digest()
+
+# Clarity, context and pattern scores depend only on the field and its document, so they are
+# shared across scorer instances and re-scoring an unchanged field is a lookup
+_COMPONENT_CACHE_SIZE = 2048
+_component_cache: "OrderedDict[tuple, Tuple[float, float, float]]" = OrderedDict()
+_component_cache_lock = threading.Lock()
+
+def _get_cached_components(key: tuple) -> Optional[Tuple[float, float, float]]:
+    """Look up memoized component scores, marking the entry as recently used"""
+    with _component_cache_lock:
+        components = _component_cache.get(key)
+        if components is not None:
+            _component_cache.move_to_end(key)
+        return components
+
+def _store_cached_components(key: tuple, components: Tuple[float, float, float]) -> None:
+    """Memoize component scores, evicting the least recently used entries"""
+    with _component_cache_lock:
+        _component_cache[key] = components
+        _component_cache.move_to_end(key)
+        while len(_component_cache) > _COMPONENT_CACHE_SIZE:
+            _component_cache.popitem(last=False)
 
 class ConfidenceScorer:
     """Advanced confidence scoring system for extracted document data"""
@@ -46,13 +229,15 @@ class ConfidenceScorer:
                 }
             }
         
-        # Calculate confidence for each field
+        # Calculate confidence for each field. The source text is normalized and swept at most
+        # once, and only when some field misses the component cache
+        ctx = {'source_hash': _source_hash(source_text), **self._field_index(fields)}
         scored_fields = []
         confidence_scores = []
         
         for field in fields:
             field_confidence = self.calculate_single_field_confidence(
-                field, source_text, doc_type, fields
+                field, source_text, doc_type, fields, ctx
             )
             scored_fields.append(field_confidence)
             confidence_scores.append(field_confidence['confidence'])
@@ -73,12 +258,46 @@ class ConfidenceScorer:
             }
         }
     
+    def _scoring_context(
+        self,
+        source_text: str,
+        doc_type: str = '',
+        fields: Optional[List[Dict]] = None
+    ) -> Dict[str, Any]:
+        """Precompute per-document values shared by every field's scorers"""
+        source_lower = source_text.lower()
+        keywords_by_field = _CONTEXT_KEYWORDS.get(doc_type, {})
+        values = {f['value'].lower() for f in fields or [] if isinstance(f.get('value'), str)}
+        
+        return {
+            'source_hash': _source_hash(source_text),
+            'source_lower': source_lower,
+            'source_chars': set(source_lower),
+            'keywords_by_field': keywords_by_field,
+            'keyword_positions': _find_occurrences(
+                {kw for keywords in keywords_by_field.values() for kw in keywords},
+                source_lower,
+                _KEYWORD_AUTOMATA.get(doc_type)
+            ),
+            'value_positions': _find_occurrences(values, source_lower),
+            **self._field_index(fields or [])
+        }
+    
+    def _field_index(self, fields: List[Dict]) -> Dict[str, Any]:
+        """Index extracted fields by name for the cross-field consistency checks"""
+        name_to_value = {f.get('name', ''): f.get('value', '') for f in fields}
+        return {
+            'name_to_value': name_to_value,
+            'name_fields': [(k, v) for k, v in name_to_value.items() if 'name' in k.lower() and v]
+        }
+    
     def calculate_single_field_confidence(
         self, 
         field: Dict[str, Any], 
         source_text: str, 
         doc_type: str, 
-        all_fields: List[Dict]
+        all_fields: List[Dict],
+        _ctx: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Calculate confidence for a single field using multiple factors"""
         
@@ -90,11 +309,26 @@ class ConfidenceScorer:
             field['confidence'] = 0.0
             return field
         
-        # Component confidence scores
-        text_clarity = self.score_text_clarity(field_value, source_text)
-        context_strength = self.score_context_strength(field_name, field_value, source_text, doc_type)
-        pattern_match = self.score_pattern_match(field_name, field_value)
-        consistency_score = self.score_cross_field_consistency(field, all_fields)
+        # Component confidence scores; those independent of the other fields are memoized
+        ctx = _ctx or self._scoring_context(source_text, doc_type, all_fields)
+        cache_key = (
+            doc_type, ctx['source_hash'], field_name, field_value,
+            tuple(self.pattern_confidence.items())
+        )
+        components = _get_cached_components(cache_key)
+        
+        if components is None:
+            if 'source_lower' not in ctx:
+                ctx.update(self._scoring_context(source_text, doc_type, all_fields))
+            components = (
+                self.score_text_clarity(field_value, source_text, ctx),
+                self.score_context_strength(field_name, field_value, source_text, doc_type, ctx),
+                self.score_pattern_match(field_name, field_value)
+            )
+            _store_cached_components(cache_key, components)
+        
+        text_clarity, context_strength, pattern_match = components
+        consistency_score = self.score_cross_field_consistency(field, all_fields, ctx)
         
         # Weighted final confidence
         final_confidence = (
@@ -124,49 +358,52 @@ class ConfidenceScorer:
         
         return field
     
-    def score_text_clarity(self, field_value: str, source_text: str) -> float:
+    def score_text_clarity(self, field_value: str, source_text: str, _ctx: Optional[Dict[str, Any]] = None) -> float:
         """Score based on text clarity and OCR quality indicators"""
         
         if not field_value:
             return 0.0
         
-        clarity_score = 1.0
+        # Factors are accumulated as logs and exponentiated once at the end
         
-        # Check for common OCR errors
-        ocr_error_patterns = [
-            r'[|]{2,}',  # Multiple pipes (common OCR error)
-            r'[0O]{3,}', # Multiple O's or 0's
-            r'[Il1]{3,}', # Multiple similar characters
-            r'[@#$%^&*]{2,}', # Multiple special characters
-            r'\s{3,}', # Excessive whitespace
-        ]
-        
-        for pattern in ocr_error_patterns:
-            if re.search(pattern, field_value):
-                clarity_score *= 0.7
+        # Check for common OCR errors; each kind of error is penalized once
+        ocr_error_kinds = {m.lastgroup for m in _OCR_ERROR_RE.finditer(field_value)}
+        log_score = len(ocr_error_kinds) * _LOG_OCR_ERROR
         
         # Length-based confidence (very short or very long values are suspicious)
         value_length = len(field_value.strip())
-        if value_length < 2:
-            clarity_score *= 0.5
-        elif value_length > 200:
-            clarity_score *= 0.8
+        log_score += (value_length < 2) * _LOG_TOO_SHORT + (value_length > 200) * _LOG_TOO_LONG
         
         # Check for mixed character types that don't make sense
-        if re.search(r'\d+[A-Za-z]+\d+', field_value) and 'address' not in field_value.lower():
-            clarity_score *= 0.8
-        
-        # Presence in source text (exact or fuzzy match)
-        if field_value.lower() in source_text.lower():
-            clarity_score *= 1.2
-        elif self.fuzzy_text_match(field_value, source_text):
-            clarity_score *= 1.1
+        mixed_alnum = bool(_MIXED_ALNUM_RE.search(field_value)) and 'address' not in field_value.lower()
+        log_score += mixed_alnum * _LOG_MIXED_ALNUM
+        
+        # Presence in source text (exact or fuzzy match); exact hits were already located
+        # in the per-document sweep, so this no longer rescans the source for every field
+        ctx = _ctx or self._scoring_context(source_text)
+        value_lower = field_value.lower()
+        value_positions = ctx['value_positions'].get(value_lower)
+        if value_positions is not None:
+            exact_match = bool(value_positions)
         else:
-            clarity_score *= 0.7
+            exact_match = value_lower in ctx['source_lower']
         
-        return min(1.0, clarity_score)
+        if exact_match:
+            presence = 2
+        else:
+            presence = int(self.fuzzy_text_match(field_value, source_text, source_chars=ctx['source_chars']))
+        log_score += _LOG_PRESENCE[presence]
+        
+        return min(1.0, math.exp(log_score))
     
-    def score_context_strength(self, field_name: str, field_value: str, source_text: str, doc_type: str) -> float:
+    def score_context_strength(
+        self,
+        field_name: str,
+        field_value: str,
+        source_text: str,
+        doc_type: str,
+        _ctx: Optional[Dict[str, Any]] = None
+    ) -> float:
         """Score based on contextual clues and field placement"""
         
         if not field_value:
@@ -174,38 +411,26 @@ class ConfidenceScorer:
         
         context_score = 0.6  # Base score
         
-        # Document type specific context keywords
-        context_keywords = {
-            'invoice': {
-                'invoice_number': ['invoice', 'inv', '#', 'number'],
-                'total_amount': ['total', 'amount', 'due', '$', 'balance'],
-                'vendor_name': ['from:', 'vendor', 'company', 'bill to'],
-                'invoice_date': ['date', 'issued', 'invoice date'],
-                'due_date': ['due', 'payment due', 'due date']
-            },
-            'medical_bill': {
-                'patient_name': ['patient', 'name', 'member'],
-                'provider_name': ['provider', 'hospital', 'clinic', 'doctor'],
-                'total_charges': ['total', 'charges', 'amount', 'balance'],
-                'service_date': ['service', 'date', 'visit date'],
-                'insurance_company': ['insurance', 'plan', 'coverage']
-            },
-            'prescription': {
-                'patient_name': ['patient', 'name'],
-                'doctor_name': ['doctor', 'physician', 'prescriber', 'md'],
-                'pharmacy_name': ['pharmacy', 'rx', 'dispensed by'],
-                'medications': ['medication', 'drug', 'rx', 'prescribed'],
-                'prescription_date': ['date', 'prescribed', 'rx date']
-            }
-        }
+        ctx = _ctx or self._scoring_context(source_text, doc_type)
         
         # Check for relevant context keywords
-        field_keywords = context_keywords.get(doc_type, {}).get(field_name, [])
-        
-        for keyword in field_keywords:
-            # Look for keyword near the field value in source text
-            if self.find_keyword_near_value(keyword, field_value, source_text):
-                context_score += 0.1
+        field_keywords = ctx['keywords_by_field'].get(field_name, [])
+        value_lower = field_value.lower()
+        value_positions = ctx['value_positions'].get(value_lower)
+        if value_positions is None and field_keywords:
+            value_positions = _find_occurrences([value_lower], ctx['source_lower'])[value_lower]
+        
+        # A value that never occurs in the source has no neighbourhood to search
+        if value_positions:
+            for keyword in field_keywords:
+                # Look for keyword near the field value in source text
+                if self.find_keyword_near_value(
+                    keyword, field_value, source_text,
+                    source_lower=ctx['source_lower'],
+                    keyword_positions=ctx['keyword_positions'].get(keyword),
+                    value_positions=value_positions
+                ):
+                    context_score += 0.1
         
         # Field-specific context validation
         context_score += self.validate_field_context(field_name, field_value)
@@ -218,65 +443,34 @@ class ConfidenceScorer:
         if not field_value:
             return 0.0
         
-        field_name_lower = field_name.lower()
+        category = _pattern_category(field_name)
         pattern_score = 0.5  # Base score
         
-        # Date patterns
-        if 'date' in field_name_lower:
-            date_patterns = [
-                r'^\d{4}-\d{2}-\d{2}$',  # YYYY-MM-DD
-                r'^\d{1,2}/\d{1,2}/\d{4}$',  # MM/DD/YYYY
-                r'^\d{1,2}-\d{1,2}-\d{4}$',  # MM-DD-YYYY
-            ]
-            for pattern in date_patterns:
-                if re.match(pattern, field_value):
-                    pattern_score = self.pattern_confidence['date']
-                    break
-        
-        # Amount patterns
-        elif any(keyword in field_name_lower for keyword in ['amount', 'total', 'subtotal', 'tax', 'charge', 'paid']):
-            amount_patterns = [
-                r'^\d+\.\d{2}$',  # XX.XX
-                r'^\$?\d{1,3}(,\d{3})*(\.\d{2})?$',  # Currency format
-                r'^\d+$',  # Integer
-            ]
-            for pattern in amount_patterns:
-                if re.match(pattern, str(field_value)):
-                    pattern_score = self.pattern_confidence['amount']
-                    break
-        
-        # Phone patterns
-        elif 'phone' in field_name_lower:
-            phone_patterns = [
-                r'^\(\d{3}\) \d{3}-\d{4}$',  # (XXX) XXX-XXXX
-                r'^\d{10}$',  # XXXXXXXXXX
-                r'^\d{3}-\d{3}-\d{4}$',  # XXX-XXX-XXXX
-            ]
-            for pattern in phone_patterns:
-                if re.match(pattern, field_value):
-                    pattern_score = self.pattern_confidence['phone']
-                    break
-        
-        # Email patterns
-        elif 'email' in field_name_lower:
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if re.match(email_pattern, field_value):
-                pattern_score = self.pattern_confidence['email']
+        # Date, amount, phone and email patterns
+        if category in _PATTERN_RES:
+            value = str(field_value)
+            if any(pattern.match(value) for pattern in _PATTERN_RES[category]):
+                pattern_score = self.pattern_confidence[category]
         
         # ID/Number patterns
-        elif any(keyword in field_name_lower for keyword in ['id', 'number', 'policy', 'member']):
+        elif category == 'id_number':
             # Should contain some numbers or be purely alphanumeric
-            if re.search(r'\d', field_value) and field_value.replace(' ', '').isalnum():
+            if _DIGIT_RE.search(field_value) and field_value.replace(' ', '').isalnum():
                 pattern_score = self.pattern_confidence['id_number']
         
         # Name patterns (should not contain numbers or excessive special chars)
-        elif 'name' in field_name_lower and 'file' not in field_name_lower:
-            if not re.search(r'\d', field_value) and len(re.findall(r'[^a-zA-Z\s\-\.]', field_value)) < 3:
+        elif category == 'name':
+            if not _DIGIT_RE.search(field_value) and len(_NON_NAME_CHAR_RE.findall(field_value)) < 3:
                 pattern_score = 0.8
         
         return min(1.0, pattern_score)
     
-    def score_cross_field_consistency(self, field: Dict[str, Any], all_fields: List[Dict]) -> float:
+    def score_cross_field_consistency(
+        self,
+        field: Dict[str, Any],
+        all_fields: List[Dict],
+        _ctx: Optional[Dict[str, Any]] = None
+    ) -> float:
         """Score based on consistency with other extracted fields"""
         
         field_name = field.get('name', '')
@@ -287,13 +481,16 @@ class ConfidenceScorer:
         
         consistency_score = 0.7  # Base score
         
-        # Create a dict of other fields for easy lookup
-        field_dict = {f['name']: f['value'] for f in all_fields if f['name'] != field_name}
+        # Fields by name, indexed once per document; this field itself is skipped on lookup
+        index = _ctx or self._field_index(all_fields)
+        name_to_value = index['name_to_value']
+        
+        def other_value(name: str) -> Any:
+            return name_to_value.get(name) if name != field_name else None
         
         # Date consistency checks
         if 'date' in field_name.lower():
-            invoice_date = field_dict.get('invoice_date')
-            due_date = field_dict.get('due_date')
+            invoice_date = other_value('invoice_date')
             
             if field_name == 'due_date' and invoice_date:
                 try:
@@ -306,8 +503,8 @@ class ConfidenceScorer:
         
         # Amount consistency checks
         if 'total' in field_name.lower():
-            subtotal = self.safe_float_convert(field_dict.get('subtotal'))
-            tax_amount = self.safe_float_convert(field_dict.get('tax_amount'))
+            subtotal = self.safe_float_convert(other_value('subtotal'))
+            tax_amount = self.safe_float_convert(other_value('tax_amount'))
             total_amount = self.safe_float_convert(field_value)
             
             if subtotal is not None and tax_amount is not None and total_amount is not None:
@@ -319,7 +516,7 @@ class ConfidenceScorer:
         
         # Name consistency (similar names across fields might indicate OCR errors)
         if 'name' in field_name.lower():
-            other_names = [v for k, v in field_dict.items() if 'name' in k.lower() and v]
+            other_names = [v for k, v in index['name_fields'] if k != field_name]
             if other_names:
                 # Check for suspiciously similar names
                 for other_name in other_names:
@@ -335,25 +532,27 @@ class ConfidenceScorer:
             return 0.0
         
         # Base calculation using weighted average
-        mean_confidence = np.mean(confidence_scores)
+        scores = np.asarray(confidence_scores, dtype=np.float64)
+        mean_confidence = scores.mean()
         
         # Penalty for high variance (inconsistent confidence across fields)
-        confidence_std = np.std(confidence_scores) if len(confidence_scores) > 1 else 0
+        confidence_std = scores.std() if scores.size > 1 else 0
         variance_penalty = min(0.2, float(confidence_std) * 0.5)
         
-        # Bonus for critical fields being present and high confidence
+        # Bonus for critical fields being present and high confidence; the first field
+        # with a given name wins, as before
         critical_fields = self.get_critical_fields(doc_type)
-        critical_field_names = [f['name'] for f in fields]
+        name_to_confidence = {f['name']: f['confidence'] for f in reversed(fields)}
         critical_bonus = 0
+        missing_critical = 0
         
         for critical_field in critical_fields:
-            if critical_field in critical_field_names:
-                field_confidence = next((f['confidence'] for f in fields if f['name'] == critical_field), 0)
-                if field_confidence > 0.8:
-                    critical_bonus += 0.05
+            if critical_field not in name_to_confidence:
+                missing_critical += 1
+            elif name_to_confidence[critical_field] > 0.8:
+                critical_bonus += 0.05
         
         # Penalty for missing critical fields
-        missing_critical = len(critical_fields) - len([f for f in critical_fields if f in critical_field_names])
         missing_penalty = missing_critical * 0.1
         
         # Field count factor (more successfully extracted fields = higher confidence)
@@ -372,45 +571,59 @@ class ConfidenceScorer:
         }
         return critical_fields.get(doc_type, critical_fields['invoice'])
     
-    def fuzzy_text_match(self, field_value: str, source_text: str, threshold: float = 0.8) -> bool:
+    def fuzzy_text_match(
+        self,
+        field_value: str,
+        source_text: str,
+        threshold: float = 0.8,
+        source_chars: Optional[set] = None
+    ) -> bool:
         """Check for fuzzy match of field value in source text"""
         if not field_value or not source_text:
             return False
         
         # Simple fuzzy matching using character overlap
-        field_clean = re.sub(r'[^\w]', '', field_value.lower())
-        source_clean = source_text.lower()
+        field_clean = _NON_WORD_RE.sub('', field_value.lower())
+        if source_chars is None:
+            source_chars = set(source_text.lower())
         
         # Check if most characters of field value appear in source
-        matching_chars = sum(1 for char in field_clean if char in source_clean)
+        matching_chars = sum(1 for char in field_clean if char in source_chars)
         return matching_chars / len(field_clean) >= threshold if field_clean else False
     
-    def find_keyword_near_value(self, keyword: str, field_value: str, source_text: str, window: int = 50) -> bool:
+    def find_keyword_near_value(
+        self,
+        keyword: str,
+        field_value: str,
+        source_text: str,
+        window: int = 50,
+        source_lower: Optional[str] = None,
+        keyword_positions: Optional[List[int]] = None,
+        value_positions: Optional[List[int]] = None
+    ) -> bool:
         """Check if keyword appears near field value in source text"""
         if not all([keyword, field_value, source_text]):
             return False
         
-        source_lower = source_text.lower()
+        if source_lower is None:
+            source_lower = source_text.lower()
         keyword_lower = keyword.lower()
         value_lower = field_value.lower()
         
-        # Find all occurrences of the field value
-        value_positions = []
-        start = 0
-        while True:
-            pos = source_lower.find(value_lower, start)
-            if pos == -1:
-                break
-            value_positions.append(pos)
-            start = pos + 1
-        
-        # Check if keyword appears within window of any value occurrence
+        # Find all occurrences of the field value and keyword, unless precomputed
+        if value_positions is None:
+            value_positions = _find_occurrences([value_lower], source_lower)[value_lower]
+        if keyword_positions is None:
+            keyword_positions = _find_occurrences([keyword_lower], source_lower)[keyword_lower]
+        
+        # Check if keyword appears within window of any value occurrence; the first
+        # keyword starting inside the window is the only candidate that can fit
         for pos in value_positions:
             window_start = max(0, pos - window)
             window_end = min(len(source_lower), pos + len(value_lower) + window)
-            window_text = source_lower[window_start:window_end]
+            i = bisect.bisect_left(keyword_positions, window_start)
             
-            if keyword_lower in window_text:
+            if i < len(keyword_positions) and keyword_positions[i] + len(keyword_lower) <= window_end:
                 return True
         
         return False
@@ -429,7 +642,7 @@ class ConfidenceScorer:
         # Amount fields should be reasonable
         elif any(term in field_name_lower for term in ['amount', 'total', 'charge', 'paid']):
             try:
-                amount = float(re.sub(r'[^\d.]', '', str(field_value)))
+                amount = float(_NON_AMOUNT_CHAR_RE.sub('', str(field_value)))
                 if 0.01 <= amount <= 1000000:  # Reasonable range
                     bonus += 0.1
             except:
@@ -446,26 +659,18 @@ class ConfidenceScorer:
         """Safely convert value to float"""
         if value is None:
             return None
-        try:
-            # Remove common currency symbols and formatting
-            clean_value = re.sub(r'[$,€£¥]', '', str(value))
-            return float(clean_value)
-        except (ValueError, TypeError):
-            return None
+        
+        # Remove common currency symbols and formatting; anything that is then not a plain
+        # decimal number is rejected up front rather than through a raised ValueError
+        clean_value = _CURRENCY_CHAR_RE.sub('', str(value))
+        return float(clean_value) if _DECIMAL_RE.match(clean_value) else None
     
     def calculate_similarity(self, str1: str, str2: str) -> float:
         """Calculate similarity between two strings"""
         if not str1 or not str2:
             return 0.0
         
-        str1_clean = str1.lower().strip()
-        str2_clean = str2.lower().strip()
-        
-        if str1_clean == str2_clean:
-            return 1.0
-        
-        # Simple character-based similarity
-        common_chars = set(str1_clean) & set(str2_clean)
-        total_chars = set(str1_clean) | set(str2_clean)
-        
-        return len(common_chars) / len(total_chars) if total_chars else 0.0
+        # Simple character-based similarity, memoized across the name-consistency pairs
+        if str1 > str2:
+            str1, str2 = str2, str1
+        return _similarity_pair(str1, str2)
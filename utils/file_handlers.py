@@ -1,9 +1,24 @@
 import io
 import base64
-from typing import Union, Dict, Any
+from typing import Union, Dict, Any, Optional
 import streamlit as st
 from PIL import Image
 
+# Leading bytes identifying each supported format
+_MAGIC_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'%PDF', 'pdf')
+]
+
+# PDF readers tolerate junk before the header, so look for it in the first kilobyte
+_SNIFF_BYTES = 1024
+
 class FileHandler:
     """Handles file upload and processing for different file types"""
     
@@ -13,8 +28,8 @@ class FileHandler:
             'image': ['png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff']
         }
     
-    def process_uploaded_file(self, uploaded_file) -> bytes:
-        """Process uploaded file and return content as bytes"""
+    def process_uploaded_file(self, uploaded_file, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+        """Process uploaded file and return content as bytes, reusing content read during validation"""
         
         if uploaded_file is None:
             raise ValueError("No file uploaded")
@@ -27,7 +42,10 @@ class FileHandler:
             raise ValueError(f"Unsupported file type: {file_extension}")
         
         # Read file content
-        file_content = uploaded_file.read()
+        if metadata and '_content' in metadata:
+            file_content = metadata['_content']
+        else:
+            file_content = uploaded_file.read()
         
         if len(file_content) == 0:
             raise ValueError("Uploaded file is empty")
@@ -68,6 +86,11 @@ class FileHandler:
             # Open image to validate it's a valid image file
             image = Image.open(io.BytesIO(image_content))
             
+            # Limit images to 4000x4000 pixels; for JPEGs, draft() lets the decoder scale down
+            # by up to 8x during the IDCT so the full-resolution pixels are never materialized
+            max_dimension = 4000
+            image.draft('RGB', (max_dimension, max_dimension))
+            
             # Convert to RGB if necessary (for RGBA, P mode images)
             if image.mode in ('RGBA', 'P'):
                 # Create white background
@@ -79,21 +102,32 @@ class FileHandler:
             elif image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            # Resize if image is too large (max 4000x4000 pixels)
-            max_dimension = 4000
+            # Resize if image is still too large
             if max(image.size) > max_dimension:
                 ratio = max_dimension / max(image.size)
-                new_size = (int(image.size[0] * ratio), int(image.size[1] * ratio))
-                image = image.resize(new_size, Image.Resampling.LANCZOS)
+                # Below 2x downscaling bilinear is visually indistinguishable and much cheaper
+                resample = Image.Resampling.BILINEAR if ratio > 0.5 else Image.Resampling.LANCZOS
+                image.thumbnail((max_dimension, max_dimension), resample)
             
-            # Convert back to bytes
+            # Convert back to bytes; skip the extra Huffman optimization pass
             output_buffer = io.BytesIO()
-            image.save(output_buffer, format='JPEG', quality=95)
+            image.save(output_buffer, format='JPEG', quality=95, optimize=False, progressive=False)
             return output_buffer.getvalue()
             
         except Exception as e:
             raise ValueError(f"Invalid image file: {str(e)}")
     
+    def _sniff_magic(self, f) -> str:
+        """Detect the file format from its leading bytes without reading the whole file"""
+        f.seek(0)
+        head = f.read(_SNIFF_BYTES)
+        f.seek(0)
+        
+        for signature, file_format in _MAGIC_SIGNATURES:
+            if head.startswith(signature):
+                return file_format
+        return 'pdf' if b'%PDF' in head else ''
+    
     def encode_image_to_base64(self, image_content: bytes) -> str:
         """Encode image content to base64 string"""
         return base64.b64encode(image_content).decode('utf-8')
@@ -106,18 +140,14 @@ class FileHandler:
     
     def format_file_size(self, size_bytes: int) -> str:
         """Format file size in human readable format"""
-        if size_bytes == 0:
+        if size_bytes <= 0:
             return "0 B"
         
+        # Unit index straight from the bit length: each unit is 2**10 of the previous
         size_names = ["B", "KB", "MB", "GB"]
-        i = 0
-        size = float(size_bytes)
-        
-        while size >= 1024.0 and i < len(size_names) - 1:
-            size /= 1024.0
-            i += 1
+        i = min((size_bytes.bit_length() - 1) // 10, len(size_names) - 1)
         
-        return f"{size:.1f} {size_names[i]}"
+        return f"{size_bytes / (1 << (10 * i)):.1f} {size_names[i]}"
     
     def extract_file_metadata(self, uploaded_file) -> Dict[str, Any]:
         """Extract metadata from uploaded file"""
@@ -175,12 +205,31 @@ class FileHandler:
                 validation_result['is_valid'] = False
                 validation_result['errors'].append("File appears to be empty")
             
+            # Check the content matches the extension before handing it to a decoder
+            if metadata['file_type'] != 'unknown' and metadata['size'] > 0:
+                sniffed_format = self._sniff_magic(uploaded_file)
+                expected_format = 'jpeg' if metadata['file_extension'] == 'jpg' else metadata['file_extension']
+                
+                if metadata['file_type'] == 'pdf' and sniffed_format != 'pdf':
+                    validation_result['is_valid'] = False
+                    validation_result['errors'].append("File is not a valid PDF")
+                elif metadata['file_type'] == 'image' and sniffed_format in ('', 'pdf'):
+                    validation_result['is_valid'] = False
+                    validation_result['errors'].append("File content is not a supported image format")
+                elif sniffed_format != expected_format:
+                    validation_result['warnings'].append(
+                        f"File extension .{metadata['file_extension']} does not match its {sniffed_format.upper()} content"
+                    )
+            
             # Additional validation for images
-            if metadata['file_type'] == 'image':
+            if metadata['file_type'] == 'image' and validation_result['is_valid']:
                 try:
-                    file_content = uploaded_file.read()
-                    uploaded_file.seek(0)  # Reset file pointer
+                    # getvalue() leaves the file pointer alone; the content is kept so
+                    # process_uploaded_file does not read the upload a second time
+                    file_content = uploaded_file.getvalue()
+                    metadata['_content'] = file_content
                     
+                    # Only the header is parsed here; pixels are decoded on load()
                     image = Image.open(io.BytesIO(file_content))
                     
                     # Check image dimensions